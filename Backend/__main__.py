@@ -1,5 +1,13 @@
-from asyncio import get_event_loop, sleep as asleep
 import asyncio
+
+# Pyrogram binds to the current event loop when it is imported below, so a uvloop loop is set first
+try:
+    import uvloop
+    asyncio.set_event_loop(uvloop.new_event_loop())
+except ImportError:
+    pass
+
+from asyncio import get_event_loop, sleep as asleep
 import logging
 from traceback import format_exc
 from pyrogram import idle
@@ -10,6 +18,7 @@ from Backend.fastapi import server
 from Backend.helper.pyro import restart_notification, setup_bot_commands
 from Backend.pyrofork.bot import Helper, StreamBot
 from Backend.pyrofork.clients import initialize_clients
+from Backend.pyrofork.plugins.file_to_link import start_cache_janitor
 
 loop = get_event_loop()
 
@@ -24,6 +33,7 @@ async def start_services():
         await StreamBot.start()
         StreamBot.username = StreamBot.me.username
         LOGGER.info(f"Bot Client : [@{StreamBot.username}]")
+        start_cache_janitor()
         await asleep(1.2)
 
         await Helper.start()
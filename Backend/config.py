@@ -11,6 +11,8 @@ class Telegram:
 
     BASE_URL = getenv("BASE_URL", "").rstrip('/')
     PORT = int(getenv("PORT", "8000"))
+    CHUNK_CACHE_SIZE = int(getenv("CHUNK_CACHE_SIZE", "64"))
+    STREAM_PIPELINE_DEPTH = int(getenv("STREAM_PIPELINE_DEPTH", "4"))
 
     AUTH_CHANNEL = [channel.strip() for channel in (getenv("AUTH_CHANNEL") or "").split(",") if channel.strip()]
     DATABASE = [db.strip() for db in (getenv("DATABASE") or "").split(",") if db.strip()]
@@ -4,5 +4,5 @@ from Backend.fastapi.main import app
 
 
 Port = Telegram.PORT
-config = uvicorn.Config(app=app, host='0.0.0.0', port=Port)
+config = uvicorn.Config(app=app, host='0.0.0.0', port=Port, http='httptools')
 server = uvicorn.Server(config)
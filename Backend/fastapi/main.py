@@ -1,9 +1,11 @@
 from fastapi import FastAPI, Request, Form, Depends, Query
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 from Backend import __version__
+from Backend.pyrofork.bot import work_loads
 from Backend.fastapi.security.credentials import require_auth
 from Backend.fastapi.routes.stream_routes import router as stream_router
 from Backend.fastapi.routes.stremio_routes import router as stremio_router
@@ -17,10 +19,20 @@ from Backend.fastapi.routes.api_routes import (
     delete_tv_episode_api, delete_tv_season_api
 )
 
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    # Media streams must keep their byte ranges intact and the player page is precompressed
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(("/dl/", "/watch/")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 app = FastAPI(
     title="Telegram Stremio Media Server",
     description="A powerful, self-hosted Telegram Stremio Media Server built with FastAPI, MongoDB, and PyroFork seamlessly integrated with Stremio for automated media streaming and discovery.",
-    version=__version__
+    version=__version__,
+    default_response_class=ORJSONResponse
 )
 
 # --- Middleware Setup ---
@@ -32,6 +44,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
 
 try:
     app.mount("/static", StaticFiles(directory="Backend/fastapi/static"), name="static")
@@ -117,7 +130,6 @@ async def delete_tv_season(tmdb_id: int, db_index: int, season: int, _: bool = D
 @app.get("/api/system/workloads")
 async def get_workloads(_: bool = Depends(require_auth)):
     try:
-        from Backend.pyrofork.bot import work_loads
         return {
             "loads": {
                 f"bot{c + 1}": l
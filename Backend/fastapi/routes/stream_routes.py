@@ -1,30 +1,92 @@
-import math
-import secrets
+import asyncio
+import brotli
+import gzip
+import re
 import mimetypes
+import os
+import random
 import urllib.parse
-from typing import Tuple
+from functools import lru_cache
+from itertools import count
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
 from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import StreamingResponse, HTMLResponse
+from fastapi.responses import Response, StreamingResponse, HTMLResponse
+from jinja2 import Environment, FileSystemLoader
 
+from Backend.config import Telegram
 from Backend.helper.encrypt import decode_string
 from Backend.helper.exceptions import InvalidHash
 from Backend.helper.custom_dl import ByteStreamer
-from Backend.pyrofork.bot import StreamBot, work_loads, multi_clients
+from Backend.pyrofork.bot import StreamBot, multi_clients, get_least_loaded_client
 
 router = APIRouter(tags=["Streaming"])
-class_cache = {}
+
+# A message's file never changes, so its hash and name are reused across the many range requests of one playback
+FILE_HASH_TTL = 300
+FILE_HASH_CACHE_SIZE = 4096
+_file_hash_cache: Dict[Tuple[int, int], Tuple[float, str, str]] = {}
+
+fallback_name_counter = count()
+
+# The extensions this server mostly sees, answered without consulting the mimetypes database
+MIME_BY_EXTENSION = {
+    ".mp4": "video/mp4",
+    ".mkv": "video/x-matroska",
+    ".webm": "video/webm",
+    ".mov": "video/quicktime",
+    ".avi": "video/x-msvideo",
+    ".m4v": "video/x-m4v",
+    ".ts": "video/mp2t",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".srt": "application/x-subrip",
+    ".pdf": "application/pdf",
+}
+
+# Quotes, backslashes and control bytes would break the quoted filename parameter
+DISPOSITION_UNSAFE = bytes.maketrans(
+    b'"\\' + bytes(range(32)) + b"\x7f",
+    b"_" * 35,
+)
+
+# Headers shared by every stream response, encoded once at import
+STATIC_STREAM_HEADERS = (
+    (b"accept-ranges", b"bytes"),
+    (b"cache-control", b"public, max-age=3600, immutable"),
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-expose-headers", b"Content-Length, Content-Range, Accept-Ranges"),
+)
+
+# Encoded headers that do not depend on the requested range, keyed like the hash cache
+FILE_HEADERS_CACHE_SIZE = 4096
+_file_headers_cache: Dict[Tuple[int, int], Tuple[str, List[Tuple[bytes, bytes]]]] = {}
+
+# Telegram serves files in 1 MiB parts, so part boundaries reduce to shifts and masks
+CHUNK_BITS = 20
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIZE - 1
+
+# Ranges up to this size are sent in a single body message instead of one per part
+COALESCE_LIMIT = 4 * CHUNK_SIZE
+
+# Seconds of random delay before a long stream's first fetch, so simultaneous seeks spread out
+STREAM_START_JITTER = (0.005, 0.02)
+
+# Matches the common single "bytes=start-[end]" form players send on every seek
+RANGE_PATTERN = re.compile(r"\s*bytes=(\d+)-(\d*)\s*$")
 
 
 def parse_range_header(range_header: str, file_size: int) -> Tuple[int, int]:
     if not range_header:
         return 0, file_size - 1
-    try:
-        range_value = range_header.replace("bytes=", "")
-        from_str, until_str = range_value.split("-")
-        from_bytes = int(from_str)
-        until_bytes = int(until_str) if until_str else file_size - 1
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid Range header: {e}")
+
+    match = RANGE_PATTERN.match(range_header)
+    if not match:
+        raise HTTPException(status_code=400, detail="Invalid Range header")
+    from_str, until_str = match.groups()
+    from_bytes = int(from_str)
+    until_bytes = int(until_str) if until_str else file_size - 1
 
     if (until_bytes > file_size - 1) or (from_bytes < 0) or (until_bytes < from_bytes):
         raise HTTPException(
@@ -36,92 +98,217 @@ def parse_range_header(range_header: str, file_size: int) -> Tuple[int, int]:
     return from_bytes, until_bytes
 
 
-@router.get("/dl/{id}/{name}")
-@router.head("/dl/{id}/{name}")
-async def stream_handler(request: Request, id: str, name: str):
-    decoded_data = await decode_string(id)
-    if not decoded_data.get("msg_id"):
+def get_streamer(client) -> ByteStreamer:
+    # Bound at startup by initialize_clients; created here only for a client added later
+    streamer = getattr(client, "byte_streamer", None)
+    if streamer is None:
+        streamer = ByteStreamer(client)
+        client.byte_streamer = streamer
+    return streamer
+
+
+class RawHeaderStreamingResponse(StreamingResponse):
+    # Headers arrive as encoded (name, value) pairs, so Starlette's encode pass is skipped
+    def init_headers(self, headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+        self.raw_headers = headers or []
+
+    async def __call__(self, scope, receive, send) -> None:
+        # Chunks go straight to the server; a single watcher task stops the stream on disconnect
+        stream_task = asyncio.current_task()
+        disconnected = False
+
+        async def watch_disconnect():
+            nonlocal disconnected
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected = True
+            stream_task.cancel()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            async for chunk in self.body_iterator:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+            # The cancel came from our own watcher, so clear it for enclosing scopes
+            stream_task.uncancel()
+        finally:
+            watcher.cancel()
+            # Run the body's cleanup (pending fetches, work load release) now, not at GC time
+            if hasattr(self.body_iterator, "aclose"):
+                await self.body_iterator.aclose()
+
+
+async def coalesce_chunks(chunks):
+    parts = [chunk async for chunk in chunks]
+    yield b"".join(parts)
+
+
+async def jittered_chunks(chunks):
+    # Fetch-ahead happens in yield_file's pipeline; this only spreads out stream starts
+    await asyncio.sleep(random.uniform(*STREAM_START_JITTER))
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        await chunks.aclose()
+
+
+@lru_cache(maxsize=256)
+def guess_mime_type(extension: str) -> Optional[str]:
+    # Keyed by extension so every file sharing one hits the same entry
+    return MIME_BY_EXTENSION.get(extension) or mimetypes.guess_type(f"file{extension}")[0]
+
+
+def build_file_headers(file_id) -> Tuple[str, List[Tuple[bytes, bytes]]]:
+    file_name = file_id.file_name
+    mime_type = file_id.mime_type or (file_name and guess_mime_type(os.path.splitext(file_name)[1].lower())) or "application/octet-stream"
+    if not file_name:
+        # Cosmetic name only, so a counter stands in for random bytes
+        extension = mime_type.split("/")[1] if "/" in mime_type else "unknown"
+        file_name = f"{next(fallback_name_counter) & 0xFFFF:04x}.{extension}"
+
+    # Plain ASCII name for old clients plus the exact UTF-8 name (RFC 6266 / RFC 5987)
+    ascii_name = file_name.encode("ascii", "replace").translate(DISPOSITION_UNSAFE)
+    content_disposition = b"".join((
+        b'inline; filename="', ascii_name,
+        b"\"; filename*=UTF-8''", urllib.parse.quote(file_name, safe="").encode("ascii"),
+    ))
+
+    headers = [
+        (b"content-type", mime_type.encode("latin-1")),
+        (b"content-disposition", content_disposition),
+        *STATIC_STREAM_HEADERS,
+    ]
+    return mime_type, headers
+
+
+async def decode_file_id(id: str) -> dict:
+    # Reject malformed ids before any Telegram work is done for them
+    try:
+        decoded_data = await decode_string(id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid id")
+    if not isinstance(decoded_data, dict) or not decoded_data.get("msg_id"):
         raise HTTPException(status_code=400, detail="Missing id")
+    return decoded_data
+
 
-    chat_id = f"-100{decoded_data['chat_id']}"
-    message = await StreamBot.get_messages(int(chat_id), int(decoded_data["msg_id"]))
+async def get_file_entry(chat_id: int, msg_id: int) -> Tuple[float, str, str]:
+    now = monotonic()
+    cached = _file_hash_cache.get((chat_id, msg_id))
+    if cached and cached[0] > now:
+        return cached
+
+    message = await StreamBot.get_messages(chat_id, msg_id)
     file = message.video or message.document
-    file_hash = file.file_unique_id[:6]
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if len(_file_hash_cache) >= FILE_HASH_CACHE_SIZE:
+        _file_hash_cache.clear()
+    entry = _file_hash_cache[(chat_id, msg_id)] = (
+        now + FILE_HASH_TTL, file.file_unique_id[:6], file.file_name or f"file_{msg_id}"
+    )
+    return entry
+
+
+async def get_file_hash(chat_id: int, msg_id: int) -> str:
+    return (await get_file_entry(chat_id, msg_id))[1]
+
+
+def resolve_chat_id(decoded_data: dict) -> int:
+    # Stored ids drop the "-100" channel prefix; -10**12 - id restores the full chat id
+    return -1_000_000_000_000 - int(decoded_data["chat_id"])
+
+
+async def stream_handler(request: Request):
+    decoded_data = await decode_file_id(request.path_params["id"])
+
+    chat_id = resolve_chat_id(decoded_data)
+    msg_id = int(decoded_data["msg_id"])
+    file_hash = await get_file_hash(chat_id, msg_id)
 
     return await media_streamer(
         request,
-        chat_id=int(chat_id),
-        id=int(decoded_data["msg_id"]),
+        chat_id=chat_id,
+        id=msg_id,
         secure_hash=file_hash
     )
 
 
+# Registered as a plain Starlette route: it only needs the request, so FastAPI's
+# parameter resolution and validation are skipped on every range request
+router.add_route("/dl/{id}/{name}", stream_handler, methods=["GET", "HEAD"], include_in_schema=False)
+
+
 async def media_streamer(
     request: Request,
     chat_id: int,
     id: int,
     secure_hash: str,
-) -> StreamingResponse:
+) -> Response:
     range_header = request.headers.get("Range", "")
-    index = min(work_loads, key=work_loads.get)
+    index = get_least_loaded_client()
     faster_client = multi_clients[index]
 
-    tg_connect = class_cache.get(faster_client)
-    if not tg_connect:
-        tg_connect = ByteStreamer(faster_client)
-        class_cache[faster_client] = tg_connect
+    tg_connect = get_streamer(faster_client)
 
     file_id = await tg_connect.get_file_properties(chat_id=chat_id, message_id=id)
     if file_id.unique_id[:6] != secure_hash:
+        # Drop every cached view of the message so a stale entry cannot keep failing the check
+        tg_connect.forget_file_properties(chat_id, id)
+        _file_hash_cache.pop((chat_id, id), None)
+        _file_headers_cache.pop((chat_id, id), None)
         raise InvalidHash
 
     file_size = file_id.file_size
     from_bytes, until_bytes = parse_range_header(range_header, file_size)
+    # A range covering the whole file ("bytes=0-") is answered as a plain 200
+    if from_bytes == 0 and until_bytes == file_size - 1:
+        range_header = ""
 
-    chunk_size = 1024 * 1024
-    offset = from_bytes - (from_bytes % chunk_size)
-    first_part_cut = from_bytes - offset
-    last_part_cut = (until_bytes % chunk_size) + 1
     req_length = until_bytes - from_bytes + 1
-    part_count = math.ceil(until_bytes / chunk_size) - math.floor(offset / chunk_size)
 
-    body = tg_connect.yield_file(
-        file_id, index, offset, first_part_cut, last_part_cut, part_count, chunk_size
-    )
+    cached_headers = _file_headers_cache.get((chat_id, id))
+    if cached_headers is None:
+        if len(_file_headers_cache) >= FILE_HEADERS_CACHE_SIZE:
+            _file_headers_cache.clear()
+        cached_headers = _file_headers_cache[(chat_id, id)] = build_file_headers(file_id)
+    mime_type, file_headers = cached_headers
 
-    file_name = file_id.file_name or f"{secrets.token_hex(2)}.unknown"
-    mime_type = file_id.mime_type or mimetypes.guess_type(file_name)[0] or "application/octet-stream"
-    if not file_id.file_name and "/" in mime_type:
-        file_name = f"{secrets.token_hex(2)}.{mime_type.split('/')[1]}"
-
-    # Encode filename for Content-Disposition header (RFC 5987)
-    # Use percent-encoding for non-ASCII characters to avoid UnicodeEncodeError
-    try:
-        # Try ASCII encoding first (faster for simple filenames)
-        file_name.encode('ascii')
-        content_disposition = f'inline; filename="{file_name}"'
-    except UnicodeEncodeError:
-        # Use RFC 5987 encoding for non-ASCII filenames
-        encoded_filename = urllib.parse.quote(file_name)
-        content_disposition = f"inline; filename*=UTF-8''{encoded_filename}"
-    
-    headers = {
-        "Content-Type": mime_type,
-        "Content-Length": str(req_length),
-        "Content-Disposition": content_disposition,
-        "Accept-Ranges": "bytes",
-        "Cache-Control": "public, max-age=3600, immutable",
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Expose-Headers": "Content-Length, Content-Range, Accept-Ranges",
-    }
+    # Only the length and range differ between requests for the same file
+    headers = file_headers + [(b"content-length", str(req_length).encode("latin-1"))]
     
     if range_header:
-        headers["Content-Range"] = f"bytes {from_bytes}-{until_bytes}/{file_size}"
+        headers.append((b"content-range", f"bytes {from_bytes}-{until_bytes}/{file_size}".encode("latin-1")))
         status_code = 206
     else:
         status_code = 200
+
+    # HEAD only needs the headers, so no parts are fetched from Telegram
+    if request.method == "HEAD":
+        response = Response(status_code=status_code)
+        response.raw_headers = headers
+        return response
+
+    offset = from_bytes & ~CHUNK_MASK
+    first_part_cut = from_bytes & CHUNK_MASK
+    last_part_cut = (until_bytes & CHUNK_MASK) + 1
+    part_count = (until_bytes >> CHUNK_BITS) - (offset >> CHUNK_BITS) + 1
+
+    body = tg_connect.yield_file(
+        file_id, index, offset, first_part_cut, last_part_cut, part_count, CHUNK_SIZE
+    )
+    if req_length <= COALESCE_LIMIT:
+        body = coalesce_chunks(body)
+    else:
+        body = jittered_chunks(body)
     
-    return StreamingResponse(
+    return RawHeaderStreamingResponse(
         status_code=status_code,
         content=body,
         headers=headers,
@@ -129,393 +316,69 @@ async def media_streamer(
     )
 
 
+# Player page is compiled once at import; autoescape covers the name and URL in every slot
+_watch_env = Environment(loader=FileSystemLoader("Backend/fastapi/templates"), autoescape=True, auto_reload=False)
+_WATCH_TEMPLATE = _watch_env.get_template("watch.html")
+
+
+# The page only depends on its URL, so browsers and any CDN in front can serve repeats themselves
+WATCH_PAGE_HEADERS = {
+    "Cache-Control": "public, max-age=86400",
+    "Vary": "Accept-Encoding",
+}
+
+
+@lru_cache(maxsize=256)
+def render_watch_page(name: str, stream_url: str) -> bytes:
+    # Repeat visits to the same file reuse the rendered page bytes
+    return _WATCH_TEMPLATE.render(name=name, stream_url=stream_url).encode("utf-8")
+
+
+@lru_cache(maxsize=256)
+def render_watch_page_gzip(name: str, stream_url: str) -> bytes:
+    # Compressed once at the highest level instead of per request by the middleware
+    return gzip.compress(render_watch_page(name, stream_url), compresslevel=9)
+
+
+@lru_cache(maxsize=256)
+def render_watch_page_brotli(name: str, stream_url: str) -> bytes:
+    # Compressed on the event loop that also carries every stream, so a cheap level is used
+    return brotli.compress(render_watch_page(name, stream_url), mode=brotli.MODE_TEXT, quality=5)
+
+
 @router.get("/watch/{id}/{name}")
 async def watch_handler(request: Request, id: str, name: str):
     """
     Serve an HTML page with video player for online streaming
     """
+    # Decode and validate the file ID
+    decoded_data = await decode_file_id(id)
+
+    # The page is rendered for the file's own name, so the free name segment cannot vary the cache key
+    _, _, name = await get_file_entry(resolve_chat_id(decoded_data), int(decoded_data["msg_id"]))
+
     try:
-        # Decode and validate the file ID
-        decoded_data = await decode_string(id)
-        if not decoded_data.get("msg_id"):
-            raise HTTPException(status_code=400, detail="Missing id")
-        
-        # Get base URL from request
-        base_url = str(request.base_url).rstrip('/')
+        # Configured base URL first, so the Host header cannot vary the cache key either
+        base_url = Telegram.BASE_URL or str(request.base_url).rstrip('/')
         
         # Construct the streaming URL
-        stream_url = f"{base_url}/dl/{id}/{name}"
+        stream_url = f"{base_url}/dl/{urllib.parse.quote(id)}/{urllib.parse.quote(name)}"
         
         # HTML5 Video Player Page (Ultra-Premium Version)
-        html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=5.0, user-scalable=yes">
-    <meta name="mobile-web-app-capable" content="yes">
-    <meta name="apple-mobile-web-app-capable" content="yes">
-    <meta name="theme-color" content="#10002b">
-    <title>{name} - Stream</title>
-    
-    <!-- External Assets -->
-    <link rel="stylesheet" href="https://cdn.plyr.io/3.7.8/plyr.css" />
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700;800&display=swap" rel="stylesheet">
-    <script src="https://www.gstatic.com/cv/js/sender/v1/cast_sender.js?loadCastFramework=1"></script>
-    
-    <style>
-        :root {{
-            --primary: #9d4edd;
-            --primary-gradient: linear-gradient(135deg, #9d4edd 0%, #3c096c 100%);
-            --bg-dark: #10002b;
-            --surface: rgba(255, 255, 255, 0.05);
-            --surface-border: rgba(255, 255, 255, 0.1);
-            --text-main: #e0aaff;
-            --text-muted: #c77dff;
-        }}
-
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-            -webkit-font-smoothing: antialiased;
-        }}
-        
-        body {{
-            background-color: var(--bg-dark);
-            background-image: 
-                radial-gradient(at 0% 0%, hsla(253,16%,7%,1) 0, transparent 50%), 
-                radial-gradient(at 50% 0%, hsla(225,39%,30%,1) 0, transparent 50%), 
-                radial-gradient(at 100% 0%, hsla(339,49%,30%,1) 0, transparent 50%);
-            font-family: 'Inter', sans-serif;
-            min-height: 100vh;
-            display: grid;
-            place-items: center;
-            color: white;
-            padding: 20px 10px;
-            overflow-x: hidden;
-        }}
-        
-        .container {{
-            width: 100%;
-            max-width: 1100px;
-            animation: fadeScale 0.8s cubic-bezier(0.2, 0.8, 0.2, 1);
-        }}
-
-        .glass-panel {{
-            background: var(--surface);
-            backdrop-filter: blur(16px);
-            -webkit-backdrop-filter: blur(16px);
-            border: 1px solid var(--surface-border);
-            border-radius: 24px;
-            padding: 40px;
-            box-shadow: 0 40px 80px rgba(0,0,0,0.4);
-        }}
-        
-        .header {{
-            text-align: center;
-            margin-bottom: 30px;
-            position: relative;
-        }}
-        
-        h1 {{
-            font-weight: 800;
-            font-size: clamp(1.5rem, 4vw, 2.2rem);
-            margin-bottom: 10px;
-            background: linear-gradient(to right, #fff, #e0aaff);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            letter-spacing: -1px;
-            line-height: 1.2;
-        }}
-        
-        .filename-badge {{
-            background: rgba(0,0,0,0.3);
-           display: inline-block;
-            padding: 6px 16px;
-            border-radius: 50px;
-            font-size: 0.9rem;
-            color: var(--text-muted);
-            border: 1px solid var(--surface-border);
-            max-width: 100%;
-            overflow: hidden;
-            text-overflow: ellipsis;
-            white-space: nowrap;
-        }}
-
-        /* Video Player Wrapper */
-        .video-container {{
-            border-radius: 16px;
-            overflow: hidden;
-            box-shadow: 0 20px 50px rgba(0,0,0,0.5);
-            background: #000;
-            aspect-ratio: 16/9;
-            position: relative;
-            margin-bottom: 30px;
-            border: 1px solid rgba(255,255,255,0.05);
-        }}
-
-        video {{
-            width: 100%;
-            height: 100%;
-            object-fit: contain;
-        }}
-
-        /* Controls Grid */
-        .controls-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(160px, 1fr));
-            gap: 12px;
-            margin-top: 20px;
-        }}
-
-        .action-btn {{
-            background: rgba(255,255,255,0.03);
-            border: 1px solid var(--surface-border);
-            padding: 18px;
-            border-radius: 14px;
-            color: white;
-            text-decoration: none;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 12px;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            cursor: pointer;
-            height: 60px;
-        }}
-
-        .action-btn:hover {{
-            background: rgba(255,255,255,0.1);
-            transform: translateY(-2px);
-            border-color: rgba(157, 78, 221, 0.5);
-            box-shadow: 0 10px 20px rgba(0,0,0,0.2);
-        }}
-
-        .action-btn.primary {{
-            background: var(--primary-gradient);
-            border: none;
-        }}
-        
-        .action-btn.primary:hover {{
-            box-shadow: 0 10px 30px rgba(157, 78, 221, 0.4);
-        }}
-
-        /* Google Cast Customization */
-        google-cast-launcher {{
-            width: 24px;
-            height: 24px;
-            --connected-color: #fff;
-            --disconnected-color: #e0aaff;
-        }}
-        
-        .cast-btn-wrapper {{
-            position: relative;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 10px;
-        }}
-
-        /* Footer */
-        .footer {{
-            margin-top: 40px;
-            text-align: center;
-            opacity: 0.5;
-            font-size: 0.8rem;
-            letter-spacing: 1px;
-            text-transform: uppercase;
-        }}
-
-        @keyframes fadeScale {{
-            0% {{ opacity: 0; transform: scale(0.95); }}
-            100% {{ opacity: 1; transform: scale(1); }}
-        }}
-
-        /* Responsive Design for All Devices */
-        
-        /* Desktop & Laptop (992px - 1199px) */
-        @media (max-width: 1199px) {{
-            .container {{ max-width: 960px; }}
-        }}
-        
-        /* Tablet Landscape (768px - 991px) */
-        @media (max-width: 991px) {{
-            .container {{ max-width: 720px; }}
-            .glass-panel {{ padding: 30px; }}
-            h1 {{ font-size: 2rem; }}
-            .controls-grid {{ 
-                grid-template-columns: repeat(2, 1fr); 
-                gap: 12px;
-            }}
-        }}
-        
-        /* Tablet Portrait & Large Mobile (576px - 767px) */
-        @media (max-width: 767px) {{
-            .glass-panel {{ padding: 24px 20px; }}
-            h1 {{ font-size: 1.75rem; }}
-            .filename-badge {{ 
-                font-size: 0.85rem; 
-                padding: 5px 14px;
-                max-width: 95%;
-            }}
-            .video-container {{ margin-bottom: 24px; }}
-            .controls-grid {{ 
-                grid-template-columns: 1fr; 
-                gap: 10px;
-            }}
-            .action-btn {{
-                height: 52px;
-                font-size: 0.9rem;
-                padding: 14px;
-            }}
-            .footer {{ 
-                font-size: 0.7rem; 
-                margin-top: 30px;
-            }}
-        }}
-        
-        /* Mobile Landscape (481px - 575px) */
-        @media (max-width: 575px) {{
-            body {{ padding: 15px; }}
-            .glass-panel {{ 
-                padding: 20px 16px; 
-                border-radius: 20px;
-            }}
-            h1 {{ font-size: 1.5rem; }}
-            .video-container {{ 
-                border-radius: 14px;
-                margin-bottom: 20px;
-            }}
-            .controls-grid {{ margin-top: 16px; }}
-        }}
-        
-        /* Mobile Portrait (320px - 480px) */
-        @media (max-width: 480px) {{
-            body {{ padding: 10px; }}
-            .glass-panel {{ 
-                padding: 16px 12px;
-                border-radius: 16px;
-            }}
-            h1 {{ 
-                font-size: 1.3rem;
-                margin-bottom: 8px;
-            }}
-            .filename-badge {{ 
-                font-size: 0.8rem;
-                padding: 4px 12px;
-            }}
-            .action-btn {{
-                height: 48px;
-                font-size: 0.85rem;
-                gap: 8px;
-                padding: 12px;
-            }}
-            .action-btn svg {{ 
-                width: 20px; 
-                height: 20px; 
-            }}
-            .footer {{ 
-                font-size: 0.65rem;
-                margin-top: 24px;
-                letter-spacing: 0.5px;
-            }}
-        }}
-        
-        /* Touch Device Optimizations */
-        @media (hover: none) and (pointer: coarse) {{
-            .action-btn {{
-                min-height: 48px;
-                padding: 16px;
-            }}
-            .action-btn:active {{
-                background: rgba(255,255,255,0.15);
-                transform: scale(0.98);
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="glass-panel">
-            <div class="header">
-                <h1>Premium Cinema</h1>
-                <div class="filename-badge" title="{name}">{name}</div>
-            </div>
-
-            <div class="video-container">
-                <video id="player" playsinline controls preload="auto">
-                    <source src="{stream_url}" type="video/mp4" />
-                    <source src="{stream_url}" type="video/webm" />
-                </video>
-            </div>
-
-            <div class="controls-grid">
-                <a href="{stream_url}" download class="action-btn primary">
-                    <svg width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/><polyline points="7 10 12 15 17 10"/><line x1="12" y1="15" x2="12" y2="3"/></svg>
-                    Download
-                </a>
-                
-                <button onclick="copyCurrentLink()" class="action-btn">
-                    <svg width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="9" y="9" width="13" height="13" rx="2" ry="2"/><path d="M5 15H4a2 2 0 0 1-2-2V4a2 2 0 0 1 2-2h9a2 2 0 0 1 2 2v1"/></svg>
-                    Copy Link
-                </button>
-            </div>
-
-            <div class="footer">
-                Powered by Telegram-Stremio • High Fidelity Streaming
-            </div>
-        </div>
-    </div>
-    
-    <script src="https://cdn.plyr.io/3.7.8/plyr.Polyfilled.js"></script>
-    <script>
-        document.addEventListener('DOMContentLoaded', () => {{
-            const player = new Plyr('#player', {{
-                captions: {{ active: true, update: true, language: 'en' }},
-                controls: [
-                    'play-large', 'restart', 'rewind', 'play', 'fast-forward', 
-                    'progress', 'current-time', 'duration', 'mute', 'volume', 
-                    'captions', 'settings', 'pip', 'airplay', 'google-cast', 'fullscreen'
-                ],
-                settings: ['captions', 'quality', 'speed', 'loop'],
-                speed: {{ selected: 1, options: [0.5, 0.75, 1, 1.25, 1.5, 2] }}
-            }});
-
-            // Exposure for debug
-            window.player = player;
-        }});
-
-        function copyCurrentLink() {{
-            const link = "{stream_url}";
-            navigator.clipboard.writeText(link).then(() => {{
-                // Subtle toast alternative
-                const btn = event.currentTarget;
-                const originalText = btn.innerHTML;
-                btn.innerHTML = '✅ Copied!';
-                setTimeout(() => btn.innerHTML = originalText, 2000);
-            }}).catch(err => {{
-                alert('Failed to copy link');
-            }});
-        }}
-
-        // Chromecast Implementation
-        // Plyr handles the session logic automatically when 'google-cast' is in controls
-        window.__onGCastApiAvailable = function(isAvailable) {{
-            if (isAvailable) {{
-                cast.framework.CastContext.getInstance().setOptions({{
-                    receiverApplicationId: chrome.cast.media.DEFAULT_MEDIA_RECEIVER_APP_ID,
-                    autoJoinPolicy: chrome.cast.AutoJoinPolicy.ORIGIN_SCOPED
-                }});
-            }}
-        }};
-    </script>
-</body>
-</html>
-        """
-        
-        return HTMLResponse(content=html_content)
+        accept_encoding = request.headers.get("accept-encoding", "")
+        if "br" in accept_encoding:
+            return Response(
+                content=render_watch_page_brotli(name, stream_url),
+                media_type="text/html",
+                headers={"Content-Encoding": "br", **WATCH_PAGE_HEADERS}
+            )
+        if "gzip" in accept_encoding:
+            return Response(
+                content=render_watch_page_gzip(name, stream_url),
+                media_type="text/html",
+                headers={"Content-Encoding": "gzip", **WATCH_PAGE_HEADERS}
+            )
+        return HTMLResponse(content=render_watch_page(name, stream_url), headers=WATCH_PAGE_HEADERS)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading player: {str(e)}")
\ No newline at end of file
@@ -13,6 +13,9 @@ ADDON_NAME = "Telegram"
 ADDON_VERSION = __version__
 PAGE_SIZE = 15
 
+# Stremio content types mapped to the database collections
+DB_MEDIA_TYPES = {"movie": "movie", "series": "tv"}
+
 router = APIRouter(prefix="/stremio", tags=["Stremio Addon"])
 
 # Define available genres
@@ -187,10 +190,11 @@ async def get_catalog(media_type: str, id: str, extra: Optional[str] = None):
 
     try:
         if search_query:
-            search_results = await db.search_documents(query=search_query, page=page, page_size=PAGE_SIZE)
-            all_items = search_results.get("results", [])
-            db_media_type = "tv" if media_type == "series" else "movie"
-            items = [item for item in all_items if item.get("media_type") == db_media_type]
+            db_media_type = DB_MEDIA_TYPES[media_type]
+            search_results = await db.search_documents(
+                query=search_query, page=page, page_size=PAGE_SIZE, media_type=db_media_type
+            )
+            items = search_results.get("results", [])
         else:
             if "latest" in id:
                 sort_params = [("updated_on", "desc")]
@@ -220,7 +224,9 @@ async def get_meta(media_type: str, id: str):
     except (ValueError, IndexError):
         raise HTTPException(status_code=400, detail="Invalid Stremio ID format")
 
-    media = await db.get_media_details(tmdb_id=tmdb_id, db_index=db_index)
+    media = await db.get_media_details(
+        tmdb_id=tmdb_id, db_index=db_index, media_type=DB_MEDIA_TYPES.get(media_type)
+    )
     if not media:
         return {"meta": {}}
 
@@ -287,7 +293,8 @@ async def get_streams(media_type: str, id: str):
         tmdb_id=tmdb_id,
         db_index=db_index,
         season_number=season_num,
-        episode_number=episode_num
+        episode_number=episode_num,
+        media_type=DB_MEDIA_TYPES.get(media_type)
     )
 
     if not media_details or "telegram" not in media_details:
@@ -1,5 +1,6 @@
 from fastapi import Request, Form, HTTPException, Depends
 from fastapi.responses import RedirectResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.templating import Jinja2Templates
 from Backend.fastapi.security.credentials import verify_credentials, require_auth, is_authenticated, get_current_user
 from Backend.fastapi.themes import get_theme, get_all_themes
@@ -110,6 +111,17 @@ async def media_management_page(request: Request, media_type: str = "movie", _:
     theme_name = request.session.get("theme", "purple_gradient")
     theme = get_theme(theme_name)
     current_user = get_current_user(request)
+
+    # Embed the first page so the browser does not need a second round-trip to show it
+    try:
+        if media_type == "tv":
+            initial_data = await db.sort_tv_shows([], 1, 24)
+        else:
+            initial_data = await db.sort_movies([], 1, 24)
+        initial_data = jsonable_encoder(initial_data)
+    except Exception as e:
+        print(f"Media management error: {e}")
+        initial_data = None
     
     return templates.TemplateResponse("media_management.html", {
         "request": request,
@@ -117,7 +129,8 @@ async def media_management_page(request: Request, media_type: str = "movie", _:
         "themes": get_all_themes(),
         "current_theme": theme_name,
         "current_user": current_user,
-        "media_type": media_type
+        "media_type": media_type,
+        "initial_data": initial_data
     })
 
 async def edit_media_page(request: Request, tmdb_id: int, db_index: int, media_type: str, _: bool = Depends(require_auth)):
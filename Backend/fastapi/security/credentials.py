@@ -3,21 +3,28 @@ from fastapi.security import HTTPBearer
 from Backend.config import Telegram
 from typing import Optional
 import hashlib
+import secrets
 
-ADMIN_PASSWORD_HASH = hashlib.sha256(Telegram.ADMIN_PASSWORD.encode()).hexdigest()
+def _digest(value: str) -> bytes:
+    return hashlib.sha256(value.encode("utf-8", "replace")).digest()
+
+ADMIN_USERNAME_HASH = _digest(Telegram.ADMIN_USERNAME)
+ADMIN_PASSWORD_HASH = _digest(Telegram.ADMIN_PASSWORD)
 
 security = HTTPBearer(auto_error=False)
 
 def verify_password(password: str) -> bool:
-    return hashlib.sha256(password.encode()).hexdigest() == ADMIN_PASSWORD_HASH
+    return secrets.compare_digest(_digest(password), ADMIN_PASSWORD_HASH)
 
 def verify_credentials(username: str, password: str) -> bool:
-    return username == Telegram.ADMIN_USERNAME and verify_password(password)
+    # Compare fixed-size digests and evaluate both checks so timing reveals neither length nor which field failed
+    username_ok = secrets.compare_digest(_digest(username), ADMIN_USERNAME_HASH)
+    return username_ok & verify_password(password)
 
 def is_authenticated(request: Request) -> bool:
     return request.session.get("authenticated", False)
 
-def require_auth(request: Request):
+async def require_auth(request: Request):
     if not is_authenticated(request):
         raise HTTPException(status_code=401, detail="Authentication required")
     return True
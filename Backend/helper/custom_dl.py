@@ -1,71 +1,151 @@
 import asyncio
+from collections import OrderedDict, deque
 from pyrogram import utils, raw
 from pyrogram.errors import AuthBytesInvalid
 from pyrogram.file_id import FileId, FileType, ThumbnailSource
 from pyrogram.session import Session, Auth
-from typing import Dict, Union
+from typing import Dict, Optional, Tuple, Union
 from Backend.logger import LOGGER
+from Backend.config import Telegram
 from Backend.helper.exceptions import FIleNotFound
 from Backend.helper.pyro import get_file_ids
-from Backend.pyrofork.bot import work_loads
+from Backend.pyrofork.bot import work_loads, set_work_load
 from pyrogram import Client, utils, raw
 
 
+# Most recently streamed files kept per client between the periodic cache clears
+FILE_ID_CACHE_SIZE = 1024
+
+
+class ChunkCache:
+    # Telegram parts shared by every stream, evicted with the CLOCK policy so hits
+    # only flip a reference bit instead of reordering a list
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.keys = [None] * slots
+        self.chunks = [None] * slots
+        self.referenced = [False] * slots
+        self.index: Dict[Tuple[int, int, int], int] = {}
+        self.hand = 0
+
+    def get(self, key: Tuple[int, int, int]) -> Optional[bytes]:
+        slot = self.index.get(key)
+        if slot is None:
+            return None
+        self.referenced[slot] = True
+        return self.chunks[slot]
+
+    def put(self, key: Tuple[int, int, int], chunk: bytes) -> None:
+        if self.slots <= 0 or key in self.index:
+            return
+        while self.referenced[self.hand]:
+            self.referenced[self.hand] = False
+            self.hand = (self.hand + 1) % self.slots
+
+        old_key = self.keys[self.hand]
+        if old_key is not None:
+            del self.index[old_key]
+        self.keys[self.hand] = key
+        self.chunks[self.hand] = chunk
+        self.index[key] = self.hand
+        self.hand = (self.hand + 1) % self.slots
+
+
+chunk_cache = ChunkCache(Telegram.CHUNK_CACHE_SIZE)
+
+# GetFile requests kept in flight per stream
+PIPELINE_DEPTH = max(1, Telegram.STREAM_PIPELINE_DEPTH)
+
+
 class ByteStreamer:
     def __init__(self, client: Client):
         self.clean_timer = 30 * 60
         self.client: Client = client
-        self.__cached_file_ids: Dict[int, FileId] = {}
+        self.__cached_file_ids: "OrderedDict[Tuple[int, int], FileId]" = OrderedDict()
         asyncio.create_task(self.clean_cache())
 
     async def get_file_properties(self, chat_id: int, message_id: int) -> FileId:
-        if message_id not in self.__cached_file_ids:
-            file_id = await get_file_ids(self.client, int(chat_id), int(message_id))
-            if not file_id:
-                LOGGER.info('Message with ID %s not found!', message_id)
-                raise FIleNotFound
-            self.__cached_file_ids[message_id] = file_id
-        return self.__cached_file_ids[message_id]
+        # Message ids are only unique per chat, so the chat is part of the key
+        key = (int(chat_id), int(message_id))
+        if key in self.__cached_file_ids:
+            self.__cached_file_ids.move_to_end(key)
+            return self.__cached_file_ids[key]
+
+        file_id = await get_file_ids(self.client, int(chat_id), int(message_id))
+        if not file_id:
+            LOGGER.info('Message with ID %s not found!', message_id)
+            raise FIleNotFound
+        self.__cached_file_ids[key] = file_id
+        if len(self.__cached_file_ids) > FILE_ID_CACHE_SIZE:
+            self.__cached_file_ids.popitem(last=False)
+        return file_id
+
+    def forget_file_properties(self, chat_id: int, message_id: int) -> None:
+        self.__cached_file_ids.pop((int(chat_id), int(message_id)), None)
+
+    @staticmethod
+    async def fetch_part(media_session: Session, location, file_id: FileId, offset: int, chunk_size: int) -> Optional[bytes]:
+        chunk_key = (file_id.media_id, offset, chunk_size)
+        chunk = chunk_cache.get(chunk_key)
+        if chunk is None:
+            r = await media_session.send(
+                raw.functions.upload.GetFile(
+                    location=location, offset=offset, limit=chunk_size
+                ),
+            )
+            if not isinstance(r, raw.types.upload.File):
+                return None
+            chunk = r.bytes
+            if chunk:
+                chunk_cache.put(chunk_key, chunk)
+        return chunk
 
     async def yield_file(self, file_id: FileId, index: int, offset: int, first_part_cut: int, last_part_cut: int, part_count: int, chunk_size: int) -> Union[str, None]: # type: ignore
         client = self.client
-        work_loads[index] += 1
+        set_work_load(index, work_loads[index] + 1)
         LOGGER.debug(f"Starting to yielding file with client {index}.")
         media_session = await self.generate_media_session(client, file_id)
         current_part = 1
         location = await self.get_location(file_id)
+        # Ranges aligned to part boundaries pass the edge chunks through without slicing
+        trim_first = first_part_cut != 0
+        trim_last = last_part_cut != chunk_size
+        # Up to PIPELINE_DEPTH parts are requested ahead and consumed in order
+        pending = deque()
+        next_offset = offset
+        parts_requested = 0
         try:
-            r = await media_session.send(raw.functions.upload.GetFile(location=location, offset=offset, limit=chunk_size))
-            if isinstance(r, raw.types.upload.File):
-                while True:
-                    chunk = r.bytes
-                    if not chunk:
-                        break
-                    elif part_count == 1:
-                        yield chunk[first_part_cut:last_part_cut]
-                    elif current_part == 1:
-                        yield chunk[first_part_cut:]
-                    elif current_part == part_count:
-                        yield chunk[:last_part_cut]
-                    else:
-                        yield chunk
-
-                    current_part += 1
-                    offset += chunk_size
-
-                    if current_part > part_count:
-                        break
-                    
-                    r = await media_session.send(
-                        raw.functions.upload.GetFile(
-                            location=location, offset=offset, limit=chunk_size
-                        ),
-                    )
+            while current_part <= part_count:
+                while len(pending) < PIPELINE_DEPTH and parts_requested < part_count:
+                    pending.append(asyncio.create_task(
+                        self.fetch_part(media_session, location, file_id, next_offset, chunk_size)
+                    ))
+                    next_offset += chunk_size
+                    parts_requested += 1
+                chunk = await pending.popleft()
+
+                # Edge parts are trimmed through a memoryview so the cut does not copy the part
+                if not chunk:
+                    break
+                elif part_count == 1:
+                    yield memoryview(chunk)[first_part_cut:last_part_cut]
+                elif current_part == 1:
+                    yield memoryview(chunk)[first_part_cut:] if trim_first else chunk
+                elif current_part == part_count:
+                    yield memoryview(chunk)[:last_part_cut] if trim_last else chunk
+                else:
+                    yield chunk
+
+                current_part += 1
         except (TimeoutError, AttributeError):
             pass
         finally:
+            for task in pending:
+                task.cancel()
+            # Collect results so fetches that failed before the cancel are not reported as unretrieved
+            await asyncio.gather(*pending, return_exceptions=True)
             LOGGER.debug("Finished yielding file with {current_part} parts.")
-            work_loads[index] -= 1
+            set_work_load(index, work_loads[index] - 1)
 
     async def generate_media_session(self, client: Client, file_id: FileId) -> Session:
         media_session = client.media_sessions.get(file_id.dc_id, None)
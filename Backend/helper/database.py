@@ -1,7 +1,8 @@
-from asyncio import create_task
+from asyncio import create_task, gather
 from bson import ObjectId
 import motor.motor_asyncio
 from datetime import datetime
+from time import monotonic
 from pydantic import ValidationError
 from pymongo import ASCENDING, DESCENDING
 from typing import Dict, List, Optional, Tuple, Any
@@ -11,7 +12,12 @@ from Backend.config import Telegram
 import re
 from Backend.helper.encrypt import decode_string, encode_string
 from Backend.helper.modal import Episode, MovieSchema, QualityDetail, Season, TVShowSchema
-from Backend.helper.task_manager import delete_message
+
+# Seconds the dashboard / status page statistics are reused before hitting the shards again
+STATS_CACHE_TTL = 30
+
+# Catalog and admin listings never read the per-file arrays, which are the bulk of each document
+LISTING_PROJECTION = {"telegram": 0, "seasons": 0}
 
 
 def convert_objectid_to_str(document: Dict[str, Any]) -> Dict[str, Any]:
@@ -37,6 +43,7 @@ class Database:
         self.dbs: Dict[str, motor.motor_asyncio.AsyncIOMotorDatabase] = {}
 
         self.current_db_index = 1
+        self._stats_cache: Tuple[float, Optional[List[dict]]] = (0.0, None)
 
     async def connect(self):
         try:
@@ -60,6 +67,7 @@ class Database:
                 self.current_db_index = state["current_index"]
 
             LOGGER.info(f"Active storage DB: storage_{self.current_db_index}")
+            await self.ensure_indexes()
 
         except Exception as e:
             LOGGER.error(f"Database connection error: {e}")
@@ -76,6 +84,20 @@ class Database:
             upsert=True
         )
 
+    async def ensure_indexes(self):
+        for db_key, db in self.dbs.items():
+            if not db_key.startswith("storage_"):
+                continue
+            try:
+                # Point lookups by id and the default listing sort
+                await gather(*(
+                    db[collection].create_index(field)
+                    for collection in ("movie", "tv")
+                    for field in ("tmdb_id", "imdb_id", "updated_on")
+                ))
+            except Exception as e:
+                LOGGER.error(f"Failed to create indexes on {db_key}: {e}")
+
 
     # -------------------------------
     # Helper Methods for Repeated Logic
@@ -92,21 +114,24 @@ class Database:
         sort_dict: Dict[str, int],
         page: int,
         page_size: int,
-        filter_dict: Optional[dict] = None
+        filter_dict: Optional[dict] = None,
+        projection: Optional[dict] = None
     ):
         filter_dict = filter_dict or {}
         skip = (page - 1) * page_size
         results = []
         dbs_checked = []
-        total_count = 0
 
-        db_counts = []
-        for i in range(1, self.current_db_index + 1):
-            db_key = f"storage_{i}"
-            db = self.dbs[db_key]
-            count = await db[collection_name].count_documents(filter_dict)
-            db_counts.append((i, count))
-            total_count += count
+        db_indexes = range(1, self.current_db_index + 1)
+        # Unfiltered listings can read the count from collection metadata instead of scanning
+        counts = await gather(*(
+            self.dbs[f"storage_{i}"][collection_name].count_documents(filter_dict)
+            if filter_dict else
+            self.dbs[f"storage_{i}"][collection_name].estimated_document_count()
+            for i in db_indexes
+        ))
+        db_counts = list(zip(db_indexes, counts))
+        total_count = sum(counts)
 
         start_db_index = None
         for db_index, count in reversed(db_counts):
@@ -115,11 +140,12 @@ class Database:
                 break
             skip -= count
 
-        if not start_db_index:
+        if start_db_index is None:
             return [], [], total_count
 
         for db_index, count in reversed(db_counts):
-            if db_index < start_db_index:
+            # Newer shards were skipped past entirely, older ones continue the page
+            if db_index > start_db_index:
                 continue
 
             db_key = f"storage_{db_index}"
@@ -128,14 +154,20 @@ class Database:
 
             cursor = (
                 db[collection_name]
-                .find(filter_dict)
+                .find(filter_dict, projection)
                 .sort(sort_dict)
                 .skip(skip if db_index == start_db_index else 0)
                 .limit(page_size - len(results))
             )
 
-            docs = await cursor.to_list(None)
-            results.extend(docs)
+            # Convert documents as the cursor yields them instead of building and re-walking a list
+            async for doc in cursor:
+                if projection is LISTING_PROJECTION:
+                    # The listing projection leaves _id as the only ObjectId in a document
+                    doc["_id"] = str(doc["_id"])
+                else:
+                    doc = convert_objectid_to_str(doc)
+                results.append(doc)
 
             if len(results) >= page_size:
                 break
@@ -169,6 +201,26 @@ class Database:
         LOGGER.info(f"Switched to storage_{self.current_db_index}")
         return await func(*args)
 
+    async def _queue_file_deletion(self, qualities: List[dict]) -> None:
+        # Group the Telegram messages per chat so each chat gets a single delete call
+        msg_ids_by_chat: Dict[int, List[int]] = {}
+        old_ids = [quality.get("id") for quality in qualities if quality.get("id")]
+        # Decode all ids at once rather than waiting on each executor round-trip in turn
+        decoded = await gather(*(decode_string(old_id) for old_id in old_ids), return_exceptions=True)
+        for decoded_data in decoded:
+            try:
+                if isinstance(decoded_data, Exception):
+                    raise decoded_data
+                chat_id = -1_000_000_000_000 - int(decoded_data['chat_id'])
+                msg_ids_by_chat.setdefault(chat_id, []).append(int(decoded_data['msg_id']))
+            except Exception as e:
+                LOGGER.error(f"Failed to queue file for deletion: {e}")
+
+        # Imported here so loading the database layer does not pull in the Telegram clients
+        from Backend.helper.task_manager import delete_messages
+        for chat_id, msg_ids in msg_ids_by_chat.items():
+            create_task(delete_messages(chat_id, msg_ids))
+
 
     # -------------------------------
     # Multi Database Method for insert/update/delete/list
@@ -299,17 +351,7 @@ class Database:
         if Telegram.REPLACE_MODE:
             # delete all same-quality entries
             to_delete = [q for q in existing_qualities if q.get("quality") == target_quality]
-
-            for q in to_delete:
-                try:
-                    old_id = q.get("id")
-                    if old_id:
-                        decoded = await decode_string(old_id)
-                        chat_id = int(f"-100{decoded['chat_id']}")
-                        msg_id = int(decoded['msg_id'])
-                        create_task(delete_message(chat_id, msg_id))
-                except Exception as e:
-                    LOGGER.error(f"Failed to delete old quality: {e}")
+            await self._queue_file_deletion(to_delete)
 
             existing_qualities = [
                 q for q in existing_qualities if q.get("quality") != target_quality
@@ -426,17 +468,7 @@ class Database:
                             q for q in existing_episode["telegram"]
                             if q.get("quality") == target_quality
                         ]
-
-                        for q in to_delete:
-                            try:
-                                old_id = q.get("id")
-                                if old_id:
-                                    decoded = await decode_string(old_id)
-                                    chat_id = int(f"-100{decoded['chat_id']}")
-                                    msg_id = int(decoded['msg_id'])
-                                    create_task(delete_message(chat_id, msg_id))
-                            except Exception as e:
-                                LOGGER.error(f"Failed to delete old quality: {e}")
+                        await self._queue_file_deletion(to_delete)
 
                         existing_episode["telegram"] = [
                             q for q in existing_episode["telegram"]
@@ -472,7 +504,7 @@ class Database:
         sort_dict = self._get_sort_dict(sort_params)
         filter_dict = {"genres": {"$in": [genre_filter]}} if genre_filter else {}
         results, dbs_checked, total_count = await self._paginate_collection(
-            "movie", sort_dict, page, page_size, filter_dict=filter_dict
+            "movie", sort_dict, page, page_size, filter_dict=filter_dict, projection=LISTING_PROJECTION
         )
         total_pages = (total_count + page_size - 1) // page_size
         return {
@@ -480,14 +512,14 @@ class Database:
             "total_pages": total_pages,
             "databases_checked": dbs_checked,
             "current_page": page,
-            "movies": [convert_objectid_to_str(result) for result in results],
+            "movies": results,
         }
 
     async def sort_tv_shows(self, sort_params, page, page_size, genre_filter=None):
         sort_dict = self._get_sort_dict(sort_params)
         filter_dict = {"genres": {"$in": [genre_filter]}} if genre_filter else {}
         results, dbs_checked, total_count = await self._paginate_collection(
-            "tv", sort_dict, page, page_size, filter_dict=filter_dict
+            "tv", sort_dict, page, page_size, filter_dict=filter_dict, projection=LISTING_PROJECTION
         )
         total_pages = (total_count + page_size - 1) // page_size
         return {
@@ -495,7 +527,7 @@ class Database:
             "total_pages": total_pages,
             "databases_checked": dbs_checked,
             "current_page": page,
-            "tv_shows": [convert_objectid_to_str(result) for result in results],
+            "tv_shows": results,
         }
 
 
@@ -504,94 +536,46 @@ class Database:
             self, 
             query: str, 
             page: int, 
-            page_size: int
+            page_size: int,
+            media_type: str = "movie"
         ) -> dict:
 
-            skip = (page - 1) * page_size
-            
+            if media_type == "tv":
+                collection_name = "tv"
+                name_field = "seasons.episodes.telegram.name"
+            else:
+                collection_name = "movie"
+                name_field = "telegram.name"
+
             words = query.split()
+            # A blank query would otherwise match the whole collection
+            if not words:
+                return {"total_count": 0, "databases_checked": [], "results": []}
+
+            # Substring match on every word in order, so partial titles ("bat" -> "Batman") are found;
+            # words are matched literally so user input cannot inject a backtracking pattern
             regex_query = {
-                '$regex': '.*' + '.*'.join(words) + '.*', 
+                '$regex': '.*'.join(re.escape(word) for word in words),
                 '$options': 'i'
             }
-            
-            tv_pipeline = [
-                {"$match": {"$or": [
-                    {"title": regex_query},
-                    {"seasons.episodes.telegram.name": regex_query}
-                ]}},
-                {"$project": {
-                    "_id": 1, "tmdb_id": 1, "title": 1, "genres": 1, "rating": 1, "imdb_id": 1,
-                    "release_year": 1, "poster": 1, "backdrop": 1, "description": 1, "logo": 1,
-                    "media_type": 1, "db_index": 1
-                }}
-            ]
-            
-            movie_pipeline = [
-                {"$match": {"$or": [
-                    {"title": regex_query},
-                    {"telegram.name": regex_query}
-                ]}},
-                {"$project": {
-                    "_id": 1, "tmdb_id": 1, "title": 1, "genres": 1, "rating": 1,
-                    "release_year": 1, "poster": 1, "backdrop": 1, "description": 1,
-                    "media_type": 1, "db_index": 1, "imdb_id": 1, "logo": 1
-                }}
-            ]
-            
-            results = []
-            dbs_checked = []
-            
-            active_db_key = f"storage_{self.current_db_index}"
-            active_db = self.dbs[active_db_key]
-            dbs_checked.append(self.current_db_index)
-            
-            tv_results = await active_db["tv"].aggregate(tv_pipeline).to_list(None)
-            movie_results = await active_db["movie"].aggregate(movie_pipeline).to_list(None)
-            combined = tv_results + movie_results
-            results.extend(combined)
-            
-            if len(results) < page_size:
-                previous_db_index = self.current_db_index - 1
-                while previous_db_index > 0 and len(results) < page_size:
-                    prev_db_key = f"storage_{previous_db_index}"
-                    prev_db = self.dbs[prev_db_key]
-                    tv_results_prev = await prev_db["tv"].aggregate(tv_pipeline).to_list(None)
-                    movie_results_prev = await prev_db["movie"].aggregate(movie_pipeline).to_list(None)
-                    combined_prev = tv_results_prev + movie_results_prev
-                    results.extend(combined_prev)
-                    dbs_checked.append(previous_db_index)
-                    previous_db_index -= 1
-
-            total_count = 0
-            for db_index in dbs_checked:
-                key = f"storage_{db_index}"
-                db = self.dbs[key]
-                tv_count = await db["tv"].count_documents({
-                    "$or": [
-                        {"title": regex_query},
-                        {"seasons.episodes.telegram.name": regex_query}
-                    ]
-                })
-                movie_count = await db["movie"].count_documents({
-                    "$or": [
-                        {"title": regex_query},
-                        {"telegram.name": regex_query}
-                    ]
-                })
-                total_count += (tv_count + movie_count)
-            
-            paged_results = results[skip:skip + page_size]
+            filter_dict = {"$or": [{"title": regex_query}, {name_field: regex_query}]}
+
+            results, dbs_checked, total_count = await self._paginate_collection(
+                collection_name, {"updated_on": DESCENDING}, page, page_size,
+                filter_dict=filter_dict, projection=LISTING_PROJECTION
+            )
 
             return {
                 "total_count": total_count,
-                "results": [convert_objectid_to_str(doc) for doc in paged_results]
+                "databases_checked": dbs_checked,
+                "results": results
             }
 
 
     async def get_media_details(
         self, tmdb_id: int, db_index: int,
-        season_number: Optional[int] = None, episode_number: Optional[int] = None
+        season_number: Optional[int] = None, episode_number: Optional[int] = None,
+        media_type: Optional[str] = None
     ) -> Optional[dict]:
         db_key = f"storage_{db_index}"
         if episode_number is not None and season_number is not None:
@@ -629,16 +613,19 @@ class Database:
             return None
 
         else:
-            tv_doc = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
-            if tv_doc:
-                tv_doc = convert_objectid_to_str(tv_doc)
-                tv_doc["type"] = "tv"
-                return tv_doc
-            movie_doc = await self.dbs[db_key]["movie"].find_one({"tmdb_id": tmdb_id})
-            if movie_doc:
-                movie_doc = convert_objectid_to_str(movie_doc)
-                movie_doc["type"] = "movie"
-                return movie_doc
+            # A known media_type routes straight to its collection instead of probing both
+            if media_type != "movie":
+                tv_doc = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
+                if tv_doc:
+                    tv_doc = convert_objectid_to_str(tv_doc)
+                    tv_doc["type"] = "tv"
+                    return tv_doc
+            if media_type != "tv":
+                movie_doc = await self.dbs[db_key]["movie"].find_one({"tmdb_id": tmdb_id})
+                if movie_doc:
+                    movie_doc = convert_objectid_to_str(movie_doc)
+                    movie_doc["type"] = "movie"
+                    return movie_doc
             return None
 
 
@@ -715,33 +702,18 @@ class Database:
         if media_type == "Movie":
             doc = await self.dbs[db_key]["movie"].find_one({"tmdb_id": tmdb_id})
             if doc and "telegram" in doc:
-                for quality in doc["telegram"]:
-                    try:
-                        old_id = quality.get("id")
-                        if old_id:
-                            decoded_data = await decode_string(old_id)
-                            chat_id = int(f"-100{decoded_data['chat_id']}")
-                            msg_id = int(decoded_data['msg_id'])
-                            create_task(delete_message(chat_id, msg_id))
-                    except Exception as e:
-                        LOGGER.error(f"Failed to queue file for deletion: {e}")
+                await self._queue_file_deletion(doc["telegram"])
             
             result = await self.dbs[db_key]["movie"].delete_one({"tmdb_id": tmdb_id})
         else:
             doc = await self.dbs[db_key]["tv"].find_one({"tmdb_id": tmdb_id})
             if doc and "seasons" in doc:
-                for season in doc["seasons"]:
-                    for episode in season.get("episodes", []):
-                        for quality in episode.get("telegram", []):
-                            try:
-                                old_id = quality.get("id")
-                                if old_id:
-                                    decoded_data = await decode_string(old_id)
-                                    chat_id = int(f"-100{decoded_data['chat_id']}")
-                                    msg_id = int(decoded_data['msg_id'])
-                                    create_task(delete_message(chat_id, msg_id))
-                            except Exception as e:
-                                LOGGER.error(f"Failed to queue file for deletion: {e}")
+                await self._queue_file_deletion([
+                    quality
+                    for season in doc["seasons"]
+                    for episode in season.get("episodes", [])
+                    for quality in episode.get("telegram", [])
+                ])
             
             result = await self.dbs[db_key]["tv"].delete_one({"tmdb_id": tmdb_id})
         
@@ -758,18 +730,7 @@ class Database:
         if not movie or "telegram" not in movie:
             return False
 
-        for q in movie["telegram"]:
-            if q.get("id") == id:
-                try:
-                    old_id = q.get("id")
-                    if old_id:
-                        decoded_data = await decode_string(old_id)
-                        chat_id = int(f"-100{decoded_data['chat_id']}")
-                        msg_id = int(decoded_data['msg_id'])
-                        create_task(delete_message(chat_id, msg_id))
-                except Exception as e:
-                    LOGGER.error(f"Failed to queue file for deletion: {e}")
-                break
+        await self._queue_file_deletion([q for q in movie["telegram"] if q.get("id") == id][:1])
         
         original_len = len(movie["telegram"])
         movie["telegram"] = [q for q in movie["telegram"] if q.get("id") != id]
@@ -793,16 +754,7 @@ class Database:
             if season.get("season_number") == season_number:
                 for ep in season["episodes"]:
                     if ep.get("episode_number") == episode_number:
-                        for quality in ep.get("telegram", []):
-                            try:
-                                old_id = quality.get("id")
-                                if old_id:
-                                    decoded_data = await decode_string(old_id)
-                                    chat_id = int(f"-100{decoded_data['chat_id']}")
-                                    msg_id = int(decoded_data['msg_id'])
-                                    create_task(delete_message(chat_id, msg_id))
-                            except Exception as e:
-                                LOGGER.error(f"Failed to queue file for deletion: {e}")
+                        await self._queue_file_deletion(ep.get("telegram", []))
                         break
                 
                 original_len = len(season["episodes"])
@@ -826,17 +778,11 @@ class Database:
         
         for season in tv["seasons"]:
             if season.get("season_number") == season_number:
-                for episode in season.get("episodes", []):
-                    for quality in episode.get("telegram", []):
-                        try:
-                            old_id = quality.get("id")
-                            if old_id:
-                                decoded_data = await decode_string(old_id)
-                                chat_id = int(f"-100{decoded_data['chat_id']}")
-                                msg_id = int(decoded_data['msg_id'])
-                                create_task(delete_message(chat_id, msg_id))
-                        except Exception as e:
-                            LOGGER.error(f"Failed to queue file for deletion: {e}")
+                await self._queue_file_deletion([
+                    quality
+                    for episode in season.get("episodes", [])
+                    for quality in episode.get("telegram", [])
+                ])
                 break
         
         original_len = len(tv["seasons"])
@@ -861,18 +807,9 @@ class Database:
             if season.get("season_number") == season_number:
                 for episode in season["episodes"]:
                     if episode.get("episode_number") == episode_number and "telegram" in episode:
-                        for q in episode["telegram"]:
-                            if q.get("id") == id:
-                                try:
-                                    old_id = q.get("id")
-                                    if old_id:
-                                        decoded_data = await decode_string(old_id)
-                                        chat_id = int(f"-100{decoded_data['chat_id']}")
-                                        msg_id = int(decoded_data['msg_id'])
-                                        create_task(delete_message(chat_id, msg_id))
-                                except Exception as e:
-                                    LOGGER.error(f"Failed to queue file for deletion: {e}")
-                                break
+                        await self._queue_file_deletion(
+                            [q for q in episode["telegram"] if q.get("id") == id][:1]
+                        )
                         
                         original_len = len(episode["telegram"])
                         episode["telegram"] = [q for q in episode["telegram"] if q.get("id") != id]
@@ -886,20 +823,28 @@ class Database:
         return result.modified_count > 0
 
 
+    async def _get_storage_stats(self, db_key: str) -> dict:
+        db = self.dbs[db_key]
+        movie_count, tv_count, db_stats = await gather(
+            db["movie"].estimated_document_count(),
+            db["tv"].estimated_document_count(),
+            db.command("dbstats")
+        )
+        return {
+            "db_name": db_key,
+            "movie_count": movie_count,
+            "tv_count": tv_count,
+            "storageSize": db_stats.get("storageSize", 0),
+            "dataSize": db_stats.get("dataSize", 0)
+        }
+
     # Get per-DB statistics (movies, tv shows, used size, etc.)
     async def get_database_stats(self):
-        stats = []
-        for key in self.dbs.keys():
-            if key.startswith("storage_"):
-                db = self.dbs[key]
-                movie_count = await db["movie"].count_documents({})
-                tv_count = await db["tv"].count_documents({})
-                db_stats = await db.command("dbstats")
-                stats.append({
-                    "db_name": key,
-                    "movie_count": movie_count,
-                    "tv_count": tv_count,
-                    "storageSize": db_stats.get("storageSize", 0),
-                    "dataSize": db_stats.get("dataSize", 0)
-                })
+        cached_at, stats = self._stats_cache
+        if stats is not None and monotonic() - cached_at < STATS_CACHE_TTL:
+            return stats
+
+        storage_keys = [key for key in self.dbs.keys() if key.startswith("storage_")]
+        stats = list(await gather(*(self._get_storage_stats(key) for key in storage_keys)))
+        self._stats_cache = (monotonic(), stats)
         return stats
@@ -1,10 +1,16 @@
 import zlib
 import json
+import orjson
 import asyncio
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 
 executor = ThreadPoolExecutor()
 
+# Stream ids are immutable, so their decoded form is kept for the watch page and every range request
+DECODE_CACHE_SIZE = 4096
+decode_cache = OrderedDict()
+
 def compress_data(data):
     return zlib.compress(data.encode(), level=zlib.Z_BEST_COMPRESSION)
 
@@ -49,6 +55,15 @@ async def encode_string(data):
     return await async_base62_encode(compressed_data)
 
 async def decode_string(encoded_data):
+    if encoded_data in decode_cache:
+        decode_cache.move_to_end(encoded_data)
+        return decode_cache[encoded_data]
+
     compressed_data = await async_base62_decode(encoded_data)
     json_data = await async_decompress_data(compressed_data)
-    return json.loads(json_data)
+    decoded_data = orjson.loads(json_data)
+
+    decode_cache[encoded_data] = decoded_data
+    if len(decode_cache) > DECODE_CACHE_SIZE:
+        decode_cache.popitem(last=False)
+    return decoded_data
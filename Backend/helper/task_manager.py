@@ -1,4 +1,5 @@
 from asyncio import sleep
+from typing import List
 from pyrogram.errors import FloodWait
 from Backend.logger import LOGGER
 from Backend.pyrofork.bot import Helper
@@ -17,16 +18,19 @@ async def edit_message(chat_id: int, msg_id: int, new_caption: str):
     except Exception as e:
         LOGGER.error(f"Error while editing message {msg_id} in {chat_id}: {e}")
 
-async def delete_message(chat_id: int, msg_id: int):
-    try:
-        await Helper.delete_messages(
-            chat_id=chat_id,
-            message_ids=msg_id
-        )
-        await sleep(2)
-        LOGGER.info(f"Deleted message {msg_id} in {chat_id}")
-    except FloodWait as e:
-        LOGGER.warning(f"FloodWait for {e.value} seconds while deleting message {msg_id} in {chat_id}")
-        await sleep(e.value)
-    except Exception as e:
-        LOGGER.error(f"Error while deleting message {msg_id} in {chat_id}: {e}")
+async def delete_messages(chat_id: int, msg_ids: List[int]):
+    # Telegram accepts up to 100 message ids per delete call
+    for start in range(0, len(msg_ids), 100):
+        batch = msg_ids[start:start + 100]
+        try:
+            await Helper.delete_messages(
+                chat_id=chat_id,
+                message_ids=batch
+            )
+            await sleep(2)
+            LOGGER.info(f"Deleted {len(batch)} message(s) in {chat_id}")
+        except FloodWait as e:
+            LOGGER.warning(f"FloodWait for {e.value} seconds while deleting {len(batch)} message(s) in {chat_id}")
+            await sleep(e.value)
+        except Exception as e:
+            LOGGER.error(f"Error while deleting {len(batch)} message(s) in {chat_id}: {e}")
@@ -1,3 +1,6 @@
+import heapq
+from itertools import count
+from random import random
 from pyrogram import Client
 from Backend.config import Telegram
 
@@ -26,4 +29,29 @@ Helper = Client(
 
 
 multi_clients = {}
-work_loads = {}
\ No newline at end of file
+work_loads = {}
+
+# Min-heap of (load, jitter, stamp, client_id); entries whose stamp is no longer current are stale
+_load_heap = []
+_load_stamps = {}
+_stamp_counter = count()
+
+
+def set_work_load(client_id, load):
+    work_loads[client_id] = load
+    stamp = next(_stamp_counter)
+    _load_stamps[client_id] = stamp
+    # Random jitter spreads new streams across clients that share the lowest load
+    heapq.heappush(_load_heap, (load, random(), stamp, client_id))
+    if len(_load_heap) > 8 * len(work_loads):
+        _load_heap[:] = [entry for entry in _load_heap if _load_stamps[entry[3]] == entry[2]]
+        heapq.heapify(_load_heap)
+
+
+def get_least_loaded_client():
+    while _load_heap:
+        _, _, stamp, client_id = _load_heap[0]
+        if _load_stamps.get(client_id) == stamp:
+            return client_id
+        heapq.heappop(_load_heap)
+    return min(work_loads, key=work_loads.get)
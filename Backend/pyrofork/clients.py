@@ -2,7 +2,8 @@ from asyncio import gather, create_task
 from pyrogram import Client
 from Backend.logger import LOGGER
 from Backend.config import Telegram
-from Backend.pyrofork.bot import multi_clients, work_loads, StreamBot
+from Backend.pyrofork.bot import multi_clients, StreamBot, set_work_load
+from Backend.helper.custom_dl import ByteStreamer
 from os import environ
 
 class TokenParser:
@@ -31,23 +32,32 @@ async def start_client(client_id, token):
             no_updates=True,
             in_memory=True
         ).start()
-        work_loads[client_id] = 0
+        set_work_load(client_id, 0)
         return client_id, client
     except Exception as e:
         LOGGER.error(f"Failed to start Client - {client_id} Error: {e}", exc_info=True)
         return None
 
+def bind_streamers():
+    # Each client carries its streamer, so stream requests never construct one
+    for client in multi_clients.values():
+        if getattr(client, "byte_streamer", None) is None:
+            client.byte_streamer = ByteStreamer(client)
+
 async def initialize_clients():
-    multi_clients[0], work_loads[0] = StreamBot, 0
+    multi_clients[0] = StreamBot
+    set_work_load(0, 0)
     all_tokens = TokenParser.parse_from_env()
     if not all_tokens:
         LOGGER.info("No additional Bot Clients found, Using default client")
+        bind_streamers()
         return
 
     tasks = [create_task(start_client(i, token)) for i, token in all_tokens.items()]
     clients = await gather(*tasks)
     clients = {client_id: client for client_id, client in clients if client} 
     multi_clients.update(clients)
+    bind_streamers()
     
     if len(multi_clients) != 1:
         LOGGER.info(f"Multi-Client Mode Enabled with {len(multi_clients)} clients")
@@ -4,18 +4,53 @@ from pyrogram.errors import FloodWait
 from Backend.config import Telegram
 from Backend.helper.encrypt import encode_string
 from Backend.logger import LOGGER
-from datetime import datetime, timedelta
-from asyncio import sleep as asleep
+from asyncio import Lock, create_task, sleep as asleep
+from collections import OrderedDict
+from time import monotonic
 import re
-import urllib.parse
+import string
 
-# In-memory cache to store user file message mapping
-# Structure: {user_id: {user_msg_id: {"dump_chat_id": int, "dump_msg_id": int, "file_name": str, "timestamp": datetime}}}
-file_cache = {}
+# In-memory cache to store user file message mapping, oldest entry first
+# Structure: {(user_id, user_msg_id): {"dump_chat_id": int, "dump_msg_id": int, "file_name": str, "timestamp": float}}
+file_cache = OrderedDict()
+
+# Files already in the dump channel, keyed by Telegram's content-stable file_unique_id
+# Structure: {file_unique_id: {"dump_msg_id": int, "timestamp": float}}
+forwarded_files = OrderedDict()
+
+# Serializes the dedup check and forward per file_unique_id, so the same file sent
+# twice in quick succession is forwarded only once
+# Structure: {file_unique_id: [Lock, holders]}, removed when the last holder leaves
+forward_locks = {}
 
 # Cache cleanup settings
 CACHE_TTL_HOURS = 1
 
+# Longest FloodWait a pending rate-limit notice will wait out
+FLOOD_NOTIFY_MAX_WAIT = 300
+
+# Pending rate-limit notices, referenced until done so they are not collected mid-sleep
+flood_notify_tasks = set()
+
+# Dump channel id without the -100 prefix, as encoded into links
+DUMP_CHAT_ID = str(Telegram.FILE_TO_LINK_DUMP).replace("-100", "") if Telegram.FILE_TO_LINK_DUMP else ""
+
+# Spaces become underscores, every other character outside [a-zA-Z0-9._-] is dropped
+FILENAME_ALLOWED = set(string.ascii_letters + string.digits + "._-")
+FILENAME_TABLE = str.maketrans({chr(c): None for c in range(128) if chr(c) not in FILENAME_ALLOWED})
+FILENAME_TABLE[ord(" ")] = ord("_")
+UNDERSCORE_RUN = re.compile(r"_{2,}")
+
+# Reply sent for /link: file name, size, stream link, download link
+LINK_REPLY_TEMPLATE = (
+    "✅ *Links Generated Successfully!*\n\n"
+    "📄 *File:* {0}\n"
+    "💾 *Size:* {1}\n\n"
+    "🎬 *Choose an option:*\n\n"
+    "🌐 *Stream:* `{2}`\n"
+    "📥 *Download:* `{3}`"
+)
+
 
 def sanitize_filename(filename):
     """Make filename URL-safe by replacing spaces and special characters"""
@@ -27,14 +62,12 @@ def sanitize_filename(filename):
         name = filename
         ext = ''
     
-    # Replace spaces with underscores
-    name = name.replace(' ', '_')
-    
-    # Remove or replace special characters, keep alphanumeric, underscore, hyphen, dot
-    name = re.sub(r'[^a-zA-Z0-9._-]', '', name)
+    # Replace spaces with underscores and drop other special characters in one pass,
+    # non-ASCII characters are dropped by the encode
+    name = name.encode('ascii', 'ignore').decode('ascii').translate(FILENAME_TABLE)
     
     # Remove multiple consecutive underscores
-    name = re.sub(r'_+', '_', name)
+    name = UNDERSCORE_RUN.sub('_', name)
     
     # Remove leading/trailing underscores
     name = name.strip('_')
@@ -47,23 +80,72 @@ def sanitize_filename(filename):
 
 def clean_expired_cache():
     """Remove expired entries from cache"""
-    current_time = datetime.utcnow()
-    users_to_remove = []
-    
-    for user_id, messages in file_cache.items():
-        msg_ids_to_remove = []
-        for msg_id, data in messages.items():
-            if current_time - data["timestamp"] > timedelta(hours=CACHE_TTL_HOURS):
-                msg_ids_to_remove.append(msg_id)
-        
-        for msg_id in msg_ids_to_remove:
-            del messages[msg_id]
-        
-        if not messages:
-            users_to_remove.append(user_id)
-    
-    for user_id in users_to_remove:
-        del file_cache[user_id]
+    # Entries are kept in insertion order, so expiry stops at the first live one
+    cutoff = monotonic() - CACHE_TTL_HOURS * 3600
+    for cache in (file_cache, forwarded_files):
+        while cache and next(iter(cache.values()))["timestamp"] <= cutoff:
+            cache.popitem(last=False)
+
+
+def is_expired(entry):
+    # Lookups check age themselves, so the janitor may run lazily
+    return entry["timestamp"] <= monotonic() - CACHE_TTL_HOURS * 3600
+
+
+async def cache_janitor():
+    while True:
+        await asleep(CACHE_TTL_HOURS * 3600 / 10)
+        clean_expired_cache()
+
+
+# Handle of the running janitor, kept so it is not garbage collected or started twice
+janitor_task = None
+
+
+def start_cache_janitor():
+    global janitor_task
+    if janitor_task is None or janitor_task.done():
+        janitor_task = create_task(cache_janitor())
+
+
+async def notify_after_flood_wait(message: Message, wait):
+    await asleep(min(wait, FLOOD_NOTIFY_MAX_WAIT))
+    try:
+        await message.reply_text(
+            f"⚠️ **Rate limit hit. Please wait {str(wait)} seconds and try again.**",
+            quote=True
+        )
+    except Exception as e:
+        LOGGER.error(f"Error sending rate limit notice: {e}")
+
+
+async def forward_once(message: Message, file_unique_id: str) -> int:
+    """Return the dump message id for a file, forwarding it only if no live copy exists"""
+    entry = forward_locks.get(file_unique_id)
+    if entry is None:
+        entry = forward_locks[file_unique_id] = [Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            # Re-uploads of the same file reuse its dump copy instead of forwarding it again
+            forwarded = forwarded_files.get(file_unique_id)
+            if forwarded and not is_expired(forwarded):
+                return forwarded["dump_msg_id"]
+
+            # Forward file to FILE_TO_LINK_DUMP channel silently
+            forwarded_msg = await message.forward(Telegram.FILE_TO_LINK_DUMP)
+            # Re-insert an expired key at the back so insertion order stays timestamp order
+            forwarded_files.pop(file_unique_id, None)
+            forwarded_files[file_unique_id] = {
+                "dump_msg_id": forwarded_msg.id,
+                "timestamp": monotonic()
+            }
+            return forwarded_msg.id
+    finally:
+        # The lock goes only once nobody holds or waits on it
+        entry[1] -= 1
+        if not entry[1]:
+            del forward_locks[file_unique_id]
 
 
 @Client.on_message(filters.private & (filters.document | filters.video) & ~filters.command(['link', 'start', 'log', 'set', 'restart']))
@@ -82,16 +164,13 @@ async def file_to_link_handler(client: Client, message: Message):
             )
             return
         
-        # Clean expired cache entries
-        clean_expired_cache()
-        
         # Get file details
         file = message.video or message.document
         file_name = file.file_name or f"file_{message.id}"
         file_size = file.file_size
         
         # Check if it's a video file
-        is_video = message.video or (message.document and message.document.mime_type and message.document.mime_type.startswith("video/"))
+        is_video = message.video or (file.mime_type or "").startswith("video/")
         
         if not is_video:
             await message.reply_text(
@@ -102,25 +181,21 @@ async def file_to_link_handler(client: Client, message: Message):
             return
         
         try:
-            # Forward file to FILE_TO_LINK_DUMP channel silently
-            forwarded_msg = await message.forward(Telegram.FILE_TO_LINK_DUMP)
+            dump_msg_id = await forward_once(message, file.file_unique_id)
             
             # Sanitize filename for URL
             url_safe_filename = sanitize_filename(file_name)
             
             # Store in cache - map to original message for /link reply
             user_id = message.from_user.id
-            if user_id not in file_cache:
-                file_cache[user_id] = {}
-            
-            file_cache[user_id][message.id] = {
-                "dump_chat_id": str(Telegram.FILE_TO_LINK_DUMP).replace("-100", ""),
-                "dump_msg_id": forwarded_msg.id,
+            file_cache[(user_id, message.id)] = {
+                "dump_chat_id": DUMP_CHAT_ID,
+                "dump_msg_id": dump_msg_id,
                 "file_name": url_safe_filename,
                 "original_name": file_name,
                 "file_size": file_size,
                 "file_size_str": get_readable_size(file_size),
-                "timestamp": datetime.utcnow()
+                "timestamp": monotonic()
             }
             
             LOGGER.info(f"File uploaded silently by user {user_id}: {file_name}")
@@ -135,12 +210,11 @@ async def file_to_link_handler(client: Client, message: Message):
             )
     
     except FloodWait as e:
-        LOGGER.info(f"Sleeping for {str(e.value)}s due to FloodWait")
-        await asleep(e.value)
-        await message.reply_text(
-            f"⚠️ **Rate limit hit. Please wait {str(e.value)} seconds and try again.**",
-            quote=True
-        )
+        LOGGER.info(f"Deferring rate limit notice by {str(e.value)}s due to FloodWait")
+        # Notify from the background so the handler does not hold a worker during the wait
+        task = create_task(notify_after_flood_wait(message, e.value))
+        flood_notify_tasks.add(task)
+        task.add_done_callback(flood_notify_tasks.discard)
     
     except Exception as e:
         LOGGER.error(f"Error in file_to_link_handler: {e}")
@@ -166,9 +240,6 @@ async def link_command_handler(client: Client, message: Message):
             )
             return
         
-        # Clean expired cache entries
-        clean_expired_cache()
-        
         # Check if this is a reply to a message
         if not message.reply_to_message:
             await message.reply_text(
@@ -182,7 +253,8 @@ async def link_command_handler(client: Client, message: Message):
         user_id = message.from_user.id
         
         # Check if file info exists in cache
-        if user_id not in file_cache or replied_msg.id not in file_cache[user_id]:
+        file_info = file_cache.get((user_id, replied_msg.id))
+        if not file_info or is_expired(file_info):
             await message.reply_text(
                 "⚠️ **File not found or link expired.**\n\n"
                 f"Links expire after {CACHE_TTL_HOURS} hour(s). Please upload the file again.",
@@ -190,9 +262,6 @@ async def link_command_handler(client: Client, message: Message):
             )
             return
         
-        # Get file info from cache
-        file_info = file_cache[user_id][replied_msg.id]
-        
         # Create encoded string for the link
         encoded_data = await encode_string({
             "chat_id": file_info["dump_chat_id"],
@@ -219,12 +288,12 @@ async def link_command_handler(client: Client, message: Message):
         
         # Send message with inline buttons AND text links
         await message.reply_text(
-            "✅ *Links Generated Successfully!*\n\n"
-            f"📄 *File:* {original_name}\n"
-            f"💾 *Size:* {file_info.get('file_size_str', 'Unknown')}\n\n"
-            "🎬 *Choose an option:*\n\n"
-            f"🌐 *Stream:* `{watch_link}`\n"
-            f"📥 *Download:* `{download_link}`",
+            LINK_REPLY_TEMPLATE.format(
+                original_name,
+                file_info.get('file_size_str', 'Unknown'),
+                watch_link,
+                download_link
+            ),
             quote=True,
             parse_mode=enums.ParseMode.MARKDOWN,
             reply_markup=reply_markup,
@@ -244,13 +313,11 @@ async def link_command_handler(client: Client, message: Message):
 
 def get_readable_size(size_bytes):
     """Convert bytes to human readable format"""
-    if size_bytes == 0:
+    if size_bytes <= 0:
         return "0 B"
     
     size_name = ("B", "KB", "MB", "GB", "TB")
-    i = 0
-    while size_bytes >= 1024 and i < len(size_name) - 1:
-        size_bytes /= 1024.0
-        i += 1
+    # Each unit spans 10 bits, so the bit length picks it without a division loop
+    i = min((size_bytes.bit_length() - 1) // 10, len(size_name) - 1)
     
-    return f"{size_bytes:.2f} {size_name[i]}"
+    return f"{size_bytes / (1 << (i * 10)):.2f} {size_name[i]}"
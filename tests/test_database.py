@@ -0,0 +1,129 @@
+import asyncio
+import os
+import re
+
+# Backend builds its Database at import time and needs tracking + storage URIs
+os.environ.setdefault("DATABASE", "mongodb://localhost/tracking,mongodb://localhost/storage")
+
+from Backend.helper.database import Database
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, sort_dict):
+        (field, direction), = sort_dict.items()
+        self.docs = sorted(self.docs, key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def skip(self, count):
+        self.docs = self.docs[count:]
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield dict(doc)
+
+
+def field_values(value, path):
+    # Dotted paths fan out through arrays the way Mongo resolves them
+    if isinstance(value, list):
+        return [found for item in value for found in field_values(item, path)]
+    if not path:
+        return [value]
+    if not isinstance(value, dict) or path[0] not in value:
+        return []
+    return field_values(value[path[0]], path[1:])
+
+
+def matches(doc, filter_dict):
+    if "$or" in filter_dict:
+        return any(matches(doc, clause) for clause in filter_dict["$or"])
+    for field, condition in filter_dict.items():
+        pattern = re.compile(condition["$regex"], re.IGNORECASE if "i" in condition["$options"] else 0)
+        if not any(isinstance(value, str) and pattern.search(value) for value in field_values(doc, field.split("."))):
+            return False
+    return True
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def count_documents(self, filter_dict):
+        return sum(matches(doc, filter_dict) for doc in self.docs)
+
+    def find(self, filter_dict, projection=None):
+        return FakeCursor([doc for doc in self.docs if matches(doc, filter_dict)])
+
+
+def make_db(shards):
+    db = Database.__new__(Database)
+    db.dbs = {
+        f"storage_{index}": {"movie": FakeCollection(docs), "tv": FakeCollection([])}
+        for index, docs in shards.items()
+    }
+    db.current_db_index = len(shards)
+    return db
+
+
+def paginate(db, page, page_size):
+    return asyncio.run(db._paginate_collection("movie", {"updated_on": -1}, page, page_size))
+
+
+def test_pagination_walks_into_older_shard():
+    # Shard 2 is the newest, so listings read it first and continue into shard 1
+    db = make_db({
+        1: [{"_id": f"old{i}", "updated_on": i} for i in range(3)],
+        2: [{"_id": f"new{i}", "updated_on": 10 + i} for i in range(3)],
+    })
+
+    pages = [paginate(db, page, 2) for page in (1, 2, 3, 4)]
+
+    assert [[doc["_id"] for doc in results] for results, _, _ in pages] == [
+        ["new2", "new1"],
+        ["new0", "old2"],
+        ["old1", "old0"],
+        [],
+    ]
+    assert [checked for _, checked, _ in pages[:3]] == [[2], [2, 1], [1]]
+    assert all(total == 6 for _, _, total in pages)
+
+
+def search(db, query):
+    return asyncio.run(db.search_documents(query, 1, 10))
+
+
+def test_search_matches_partial_words():
+    # A whole-word hit must not hide titles that only contain the query as a substring
+    db = make_db({
+        1: [
+            {"_id": "bat", "title": "The Bat", "updated_on": 1},
+            {"_id": "batman", "title": "Batman Begins", "updated_on": 2},
+            {"_id": "file", "title": "Unrelated", "telegram": [{"name": "Combat.Zone.mkv"}], "updated_on": 3},
+            {"_id": "other", "title": "Heat", "updated_on": 4},
+        ],
+    })
+
+    result = search(db, "bat")
+
+    assert [doc["_id"] for doc in result["results"]] == ["file", "batman", "bat"]
+    assert result["total_count"] == 3
+
+
+def test_search_blank_query_returns_nothing():
+    db = make_db({1: [{"_id": "any", "title": "Anything", "updated_on": 1}]})
+
+    for query in ("", "   "):
+        assert search(db, query) == {"total_count": 0, "databases_checked": [], "results": []}